@@ -6,9 +6,10 @@ Heurística constructiva en cuatro fases:
   – Fase 4 (Ejection‐Chain profunda L=3)
 """
 
-import math, re, sys, time, heapq, random
+import math, re, os, sys, time, heapq, random, hashlib, pickle
+from bisect import bisect_left
 from collections import namedtuple
-from copy import deepcopy
+from concurrent.futures import ProcessPoolExecutor
 
 # — Parámetros globales —————————————————————————
 SEED         = 42
@@ -18,6 +19,10 @@ PHASE3_TIME  = 15.0    # segundos de fase 3
 PHASE4_TIME  = 15.0    # segundos de fase 4
 ALPHA_RCL    = 0.15    # RCL para GRASP
 TOP_K        = 3       # candidatos en Giant-Split
+WORKERS      = min(os.cpu_count() or 1, 61)   # procesos fases 1 y 2 (tope de Windows: 61)
+TWO_OPT_MEMO = 20000   # rutas memorizadas por 2-opt en fases 3 y 4
+CACHE_DIR    = '.carp_cache'   # instancias preprocesadas (clave: SHA-1 del .dat)
+CACHE_FMT    = '3'     # subir si cambian los campos de Instance
 
 # Best Known Solutions (óptimos)
 BKS = {
@@ -28,147 +33,263 @@ BKS = {
     'gdb21':156,'gdb22':200,'gdb23':233
 }
 
-Arc = namedtuple('Arc','u v cost dem')
+# Expresiones del formato .dat, compiladas una sola vez
+_NAME_RE   = re.compile(r'NOMBRE\s*:\s*(\S+)', re.I)
+_GDB_RE    = re.compile(r'(gdb\d+)')
+_FIELD_RE  = {tag: re.compile(rf'{tag}\s*:\s*(\d+)', re.I)
+              for tag in ('VERTICES','CAPACIDAD','DEPOSITO')}
+_REQ_RE    = re.compile(r'LISTA_ARISTAS_REQ\S*\s*:(.*?)(?:LISTA_ARISTAS_NO_REQ|$)', re.S|re.I)
+_NOREQ_RE  = re.compile(r'LISTA_ARISTAS_NO_REQ\s*:(.*?)$', re.S|re.I)
+# primeros 4 (resp. 3) números de cada línea que los tenga
+_ROW4_RE   = re.compile(r'^[^\d\n]*(\d+)[^\d\n]+(\d+)[^\d\n]+(\d+)[^\d\n]+(\d+)', re.M)
+_ROW3_RE   = re.compile(r'^[^\d\n]*(\d+)[^\d\n]+(\d+)[^\d\n]+(\d+)', re.M)
+
+# campos de Instance guardados en la caché de disco
+_CACHE_KEYS = {'name','V','Q','depot','adj','dist','cost_mat','dem_mat',
+               'arc_u','arc_v','arc_cost','arc_dem'}
+
+Arc   = namedtuple('Arc','u v cost dem')
+# cost: coste cacheado del tour; req: posiciones p con (tour[p],tour[p+1]) requerido
+Route = namedtuple('Route','tour load cost req')
 
 class Instance:
     def __init__(self, path):
-        txt = open(path, encoding='utf-8').read()
-        nm  = re.search(r'NOMBRE\s*:\s*(\S+)', txt, re.I).group(1).lower()
-        m   = re.match(r'(gdb\d+)', nm)
+        raw = open(path, 'rb').read()
+        key = hashlib.sha1(raw + CACHE_FMT.encode()).hexdigest()
+        cache = os.path.join(CACHE_DIR, key + '.pkl')
+        # la caché es desechable: cualquier fallo al leerla se trata como ausente
+        try:
+            with open(cache, 'rb') as f:
+                data = pickle.load(f)
+            if not (isinstance(data, dict) and _CACHE_KEYS <= data.keys()):
+                data = None
+        except Exception:
+            data = None
+        if data is not None:
+            self.__dict__.update(data)
+        else:
+            self._parse_dat(raw.decode('utf-8'))
+            try:
+                os.makedirs(CACHE_DIR, exist_ok=True)
+                tmp = f'{cache}.{os.getpid()}'
+                with open(tmp, 'wb') as f:
+                    pickle.dump(self.__dict__, f, pickle.HIGHEST_PROTOCOL)
+                os.replace(tmp, cache)
+            except OSError:
+                pass   # sin caché: se recalcula en la próxima ejecución
+        # vista Arc para código externo; el solver trabaja con las listas arc_*
+        self.req = [Arc(*a) for a in zip(self.arc_u, self.arc_v, self.arc_cost, self.arc_dem)]
+
+    def _parse_dat(self, txt):
+        nm  = _NAME_RE.search(txt).group(1).lower()
+        m   = _GDB_RE.match(nm)
         self.name = m.group(1) if m else nm
-        gi = lambda tag: int(re.search(rf'{tag}\s*:\s*(\d+)', txt, re.I).group(1))
+        gi = lambda tag: int(_FIELD_RE[tag].search(txt).group(1))
         self.V, self.Q, self.depot = gi('VERTICES'), gi('CAPACIDAD'), gi('DEPOSITO')
-        self.adj, self.req = {i:{} for i in range(1,self.V+1)}, []
+        self.adj = {i:{} for i in range(1,self.V+1)}
+        # arcos requeridos por índice (estructura de listas paralelas)
+        self.arc_u, self.arc_v, self.arc_cost, self.arc_dem = [], [], [], []
         def add(u,v,c,d=0):
             self.adj[u][v] = self.adj[v][u] = c
             if d>0:
-                self.req.append(Arc(u,v,c,d))
-        b = re.search(r'LISTA_ARISTAS_REQ\S*\s*:(.*?)(?:LISTA_ARISTAS_NO_REQ|$)', txt, re.S|re.I)
+                self.arc_u.append(u); self.arc_v.append(v)
+                self.arc_cost.append(c); self.arc_dem.append(d)
+        b = _REQ_RE.search(txt)
         if b:
-            for ln in b.group(1).splitlines():
-                nums = list(map(int, re.findall(r'\d+', ln)))
-                if len(nums) >= 4:
-                    add(*nums[:4])
-        b = re.search(r'LISTA_ARISTAS_NO_REQ\s*:(.*?)$', txt, re.S|re.I)
+            for row in _ROW4_RE.findall(b.group(1)):
+                add(*map(int, row))
+        b = _NOREQ_RE.search(txt)
         if b:
-            for ln in b.group(1).splitlines():
-                nums = list(map(int, re.findall(r'\d+', ln)))
-                if len(nums) >= 3:
-                    add(nums[0], nums[1], nums[2])
-        self.dem  = {(a.u,a.v):a.dem for a in self.req}
-        self.dem.update({(a.v,a.u):a.dem for a in self.req})
-        self.cost = {(a.u,a.v):a.cost for a in self.req}
-        self.cost.update({(a.v,a.u):a.cost for a in self.req})
-        INF = math.inf
-        self.dist = [[INF]*(self.V+1) for _ in range(self.V+1)]
-        for s in range(1,self.V+1):
-            self.dist[s][s] = 0
-            pq = [(0,s)]
-            while pq:
-                d,u = heapq.heappop(pq)
-                if d > self.dist[s][u]: continue
-                for v,c in self.adj[u].items():
-                    nd = d + c
-                    if nd < self.dist[s][v]:
-                        self.dist[s][v] = nd
-                        heapq.heappush(pq, (nd, v))
+            for row in _ROW3_RE.findall(b.group(1)):
+                add(*map(int, row))
+        self.dist = shortest_paths(self.V, self.adj)
+        # matrices densas: coste del arco si es requerido, si no distancia mínima
+        self.cost_mat = [row[:] for row in self.dist]
+        self.dem_mat  = [[0]*(self.V+1) for _ in range(self.V+1)]
+        for u,v,c,d in zip(self.arc_u, self.arc_v, self.arc_cost, self.arc_dem):
+            self.cost_mat[u][v] = self.cost_mat[v][u] = c
+            self.dem_mat[u][v]  = self.dem_mat[v][u]  = d
+
+def shortest_paths(V, adj):
+    """Dijkstra desde cada vértice sobre listas de vecinos precalculadas."""
+    INF = math.inf
+    nbrs = [()] + [tuple(adj[u].items()) for u in range(1,V+1)]
+    push, pop = heapq.heappush, heapq.heappop
+    dist = [[INF]*(V+1)]
+    for s in range(1,V+1):
+        row = [INF]*(V+1)
+        row[s] = 0
+        pq = [(0,s)]
+        while pq:
+            d,u = pop(pq)
+            if d > row[u]: continue
+            for v,c in nbrs[u]:
+                nd = d + c
+                if nd < row[v]:
+                    row[v] = nd
+                    push(pq, (nd, v))
+        dist.append(row)
+    return dist
+
+def route_cost(tour, C):
+    c, u = 0, tour[0]
+    for v in tour[1:]:
+        c += C[u][v]
+        u = v
+    return c
+
+def make_route(tour, load, inst):
+    M=inst.dem_mat
+    req=tuple(p for p in range(1,len(tour)-1) if M[tour[p]][tour[p+1]])
+    return Route(tour, load, route_cost(tour, inst.cost_mat), req)
 
 def compute_cost(sol, inst):
-    return sum(inst.cost.get((u,v), inst.dist[u][v])
-               for tour,_ in sol for u,v in zip(tour, tour[1:]))
+    return sum(r.cost for r in sol)
 
 def trivial_solution(inst):
-    return [([inst.depot,a.u,a.v,inst.depot], a.dem) for a in inst.req]
+    dp=inst.depot
+    return [make_route([dp,u,v,dp], d, inst)
+            for u,v,d in zip(inst.arc_u, inst.arc_v, inst.arc_dem)]
 
 #   (1) GRASP‐RCL + LS ligera + ejection‐chain L=1
 
 def constructive_grasp(inst):
-    unserved = set((a.u,a.v) for a in inst.req)
+    U,V,dem=inst.arc_u,inst.arc_v,inst.arc_dem
+    n=len(U)
+    served=[False]*n
+    left=n
     routes = []
-    while unserved:
+    while left:
         cur, load = inst.depot, 0
         tour = [inst.depot]
         while True:
-            C=[]
-            for u,v in unserved:
-                d=inst.dem[(u,v)]
-                if load+d>inst.Q: continue
-                C.append((inst.dist[cur][u],u,v))
+            row,cap=inst.dist[cur],inst.Q-load
+            C=[k for k in range(n) if not served[k] and dem[k]<=cap]
             if not C: break
-            C.sort(key=lambda x:x[0])
-            dmin,dmax=C[0][0],C[-1][0]
+            ds=[row[U[k]] for k in C]
+            dmin,dmax=min(ds),max(ds)
             thr = dmin + ALPHA_RCL*(dmax-dmin)
-            RCL=[(u,v) for dist,u,v in C if dist<=thr]
-            u,v=random.choice(RCL)
-            tour.extend([u,v])
-            load+=inst.dem[(u,v)]
-            unserved.remove((u,v))
-            cur=v
+            RCL=[k for k,d in zip(C,ds) if d<=thr]
+            k=random.choice(RCL)
+            tour.extend([U[k],V[k]])
+            load+=dem[k]
+            served[k]=True; left-=1
+            cur=V[k]
         tour.append(inst.depot)
-        routes.append((tour, load))
+        routes.append(make_route(tour, load, inst))
     return routes
 
-def intra_two_opt(sol, inst):
-    for i,(tour,load) in enumerate(sol):
-        best_t,delta=tour,0
-        L=len(tour)
-        for a in range(1,L-2):
-            for b in range(a+1,L-1):
-                u1,v1=tour[a-1],tour[a]
-                u2,v2=tour[b],tour[b+1]
-                old=inst.dist[u1][v1]+inst.dist[u2][v2]
-                new=inst.dist[u1][u2]+inst.dist[v1][v2]
-                d=new-old
-                if d<delta:
-                    delta, best_t = d, tour[:a]+tour[a:b+1][::-1]+tour[b+1:]
+def two_opt_route(tour, D):
+    """Mejor movimiento 2-opt de una ruta: devuelve (delta, ruta)."""
+    L=len(tour)
+    edge=[D[tour[k]][tour[k+1]] for k in range(L-1)]
+    delta,best=0,None
+    for a in range(1,L-2):
+        r1,r2=D[tour[a-1]],D[tour[a]]
+        old=edge[a-1]
+        for b in range(a+1,L-1):
+            d=r1[tour[b]]+r2[tour[b+1]]-old-edge[b]
+            if d<delta:
+                delta,best=d,(a,b)
+    if best is None:
+        return 0,tour
+    a,b=best
+    return delta, tour[:a]+tour[a:b+1][::-1]+tour[b+1:]
+
+def intra_two_opt(sol, inst, memo=None):
+    # memo: tabla ruta -> mejor 2-opt. Sólo compensa en las fases 3 y 4,
+    # donde casi todas las rutas se repiten entre llamadas
+    for i,(tour,load,_,_) in enumerate(sol):
+        if memo is None:
+            hit=two_opt_route(tour,inst.dist)
+        else:
+            key=tuple(tour)
+            hit=memo.get(key)
+            if hit is None:
+                if len(memo)>=TWO_OPT_MEMO:
+                    memo.clear()
+                hit=memo[key]=two_opt_route(tour,inst.dist)
+        delta,best_t=hit
         if delta<0:
-            sol[i]=(best_t, load)
+            sol[i]=make_route(best_t, load, inst)
     return sol
 
+# Δ-coste de relocate(), repartido para poder fijar ti/pos fuera del bucle en j.
+# Ambos admiten rutas que una eyección dejó sin depósito final o con un solo vértice.
+
+def removal_delta(ti, pos, C):
+    """Cambio de coste de ti al quitar el arco (ti[pos],ti[pos+1])."""
+    p,u,v=ti[pos-1],ti[pos],ti[pos+1]
+    if pos+2<len(ti):
+        n=ti[pos+2]
+        return C[p][n]-C[p][u]-C[u][v]-C[v][n]
+    return -C[p][u]-C[u][v]
+
+def insertion_delta(tj, u, v, C):
+    """Cambio de coste de tj al insertar el arco (u,v) antes de su último vértice."""
+    e=tj[-1]
+    if len(tj)>1:
+        z=tj[-2]
+        return C[z][u]+C[u][v]+C[v][e]-C[z][e]
+    return C[u][v]+C[v][e]
+
+def relocate_delta(sol, i, pos, j, inst):
+    """Δ-coste de relocate(sol,i,pos,j) sin construir la solución vecina."""
+    ti,tj=sol[i].tour,sol[j].tour
+    C=inst.cost_mat
+    return removal_delta(ti,pos,C)+insertion_delta(tj,ti[pos],ti[pos+1],C)
+
+def relocate(sol, i, pos, j, inst):
+    """Mueve el arco (ti[pos],ti[pos+1]) al final de la ruta j, in situ.
+    Sólo se recalcula el coste de las dos rutas tocadas."""
+    (ti,li,_,_),(tj,lj,_,_)=sol[i],sol[j]
+    u,v=ti[pos],ti[pos+1]
+    d=inst.dem_mat[u][v]
+    sol[i]=make_route(ti[:pos]+ti[pos+2:],li-d,inst)
+    sol[j]=make_route(tj[:-1]+[u,v]+[tj[-1]],lj+d,inst)
+
 def inter_relocate(sol, inst):
+    C,Q=inst.cost_mat,inst.Q
+    sol=list(sol)
     improved=True
     while improved:
         improved=False
-        base=compute_cost(sol,inst)
-        for i,(ti,li) in enumerate(sol):
+        for i,(ti,li,_,_) in enumerate(sol):
             for pos in range(1,len(ti)-2):
                 u,v=ti[pos],ti[pos+1]
-                d=inst.dem.get((u,v),0)
+                d=inst.dem_mat[u][v]
                 if d==0 or li-d<0: continue
-                for j,(tj,lj) in enumerate(sol):
-                    if i==j or lj+d>inst.Q: continue
-                    nr=deepcopy(sol)
-                    nr[i]=(ti[:pos]+ti[pos+2:],li-d)
-                    nr[j]=(tj[:-1]+[u,v]+[tj[-1]],lj+d)
-                    c=compute_cost(nr,inst)
-                    if c<base:
-                        sol,base,improved=nr,c,True
+                gain=removal_delta(ti,pos,C)
+                for j,(tj,lj,_,_) in enumerate(sol):
+                    if i==j or lj+d>Q: continue
+                    if gain+insertion_delta(tj,u,v,C)<0:
+                        relocate(sol,i,pos,j,inst)
+                        improved=True
                         break
                 if improved: break
             if improved: break
     return sol
 
-def ejection_chain(sol, inst, L=1):
+def ejection_chain(sol, inst, L=1, memo=None):
     best_sol = sol
     best_c   = compute_cost(sol, inst)
     for _ in range(L):
-        sol = intra_two_opt(sol, inst)
+        sol = intra_two_opt(sol, inst, memo)
         sol = inter_relocate(sol, inst)
-        for i,(ti,li) in enumerate(sol):
-            poss=[p for p in range(1,len(ti)-1) if (ti[p],ti[p+1]) in inst.dem]
+        cur_c = compute_cost(sol, inst)
+        for i,(ti,_,_,poss) in enumerate(sol):
             if not poss: continue
             pos=random.choice(poss)
             u,v=ti[pos],ti[pos+1]
-            d=inst.dem[(u,v)]
-            j=random.choice([x for x in range(len(sol)) if x!=i])
-            tj,lj=sol[j]
-            if lj+d<=inst.Q:
-                nr=deepcopy(sol)
-                nr[i]=(ti[:pos]+ti[pos+2:],li-d)
-                nr[j]=(tj[:-1]+[u,v]+[tj[-1]],lj+d)
-                c=compute_cost(nr,inst)
+            d=inst.dem_mat[u][v]
+            j=random.randrange(len(sol)-1)   # cualquier ruta salvo i
+            if j>=i: j+=1
+            if sol[j].load+d<=inst.Q:
+                # se evalúa sobre sol; sólo se copia si mejora la mejor
+                c=cur_c+relocate_delta(sol,i,pos,j,inst)
                 if c<best_c:
-                    best_sol,best_c=nr,c
+                    best_sol,best_c=sol[:],c
+                    relocate(best_sol,i,pos,j,inst)
         sol=best_sol
     return best_sol
 
@@ -182,43 +303,50 @@ def constructive_with_ls(inst):
 #   (2) Giant-Split (Randomized Giant + Split + 2-opt)
 
 def build_randomized_giant(inst):
-    un=set((a.u,a.v) for a in inst.req)
+    U,V=inst.arc_u,inst.arc_v
+    n=len(U)
+    served=[False]*n
     path=[inst.depot]; cur=inst.depot
-    while un:
-        cand=[(inst.dist[cur][u],u,v) for u,v in un]
-        cand.sort(key=lambda x:x[0])
-        top=cand[:min(TOP_K,len(cand))]
-        _,u,v=random.choice(top)
-        path.extend([u,v])
-        cur=v; un.remove((u,v))
+    for _ in range(n):
+        row=inst.dist[cur]
+        cand=[(row[U[k]],k) for k in range(n) if not served[k]]
+        cand.sort()
+        _,k=random.choice(cand[:TOP_K])
+        path.extend([U[k],V[k]])
+        cur=V[k]; served[k]=True
     path.append(inst.depot)
     return path
 
 def split_giant(inst,path):
     n=len(path)
+    D,depot=inst.dist,inst.depot
     pd=[0]*n; pc=[0]*n
     for i in range(1,n):
         u,v=path[i-1],path[i]
-        pd[i]=pd[i-1]+inst.dem.get((u,v),0)
-        pc[i]=pc[i-1]+inst.cost.get((u,v),inst.dist[u][v])
+        pd[i]=pd[i-1]+inst.dem_mat[u][v]
+        pc[i]=pc[i-1]+inst.cost_mat[u][v]
+    d_from=[D[depot][p] for p in path]
+    d_to=[D[p][depot] for p in path]
     dp=[math.inf]*n; prev=[-1]*n
     dp[0]=0
+    # h[i] = dp[i]+d_from[i]-pc[i]: coste de abrir ruta en i, sin el tramo final
+    h=[0]*n
+    h[0]=d_from[0]-pc[0]
     for j in range(1,n):
-        for i in range(j,-1,-1):
-            load=pd[j]-pd[i]
-            if load>inst.Q: break
-            cost=dp[i]
-            cost+=inst.dist[inst.depot][path[i]]
-            cost+=pc[j]-pc[i]
-            cost+=inst.dist[path[j]][inst.depot]
-            if cost<dp[j]:
-                dp[j],prev[j]=cost,i
+        # pd es no decreciente: los i factibles forman el tramo [lo, j)
+        lo=bisect_left(pd,pd[j]-inst.Q,0,j)
+        if lo<j:
+            seg=h[lo:j]
+            m=min(seg)
+            # a igual coste se queda con el i mayor, como el barrido descendente
+            dp[j],prev[j]=m+pc[j]+d_to[j], j-1-seg[::-1].index(m)
+        h[j]=dp[j]+d_from[j]-pc[j]
     sol=[]; j=n-1
     while j>0:
         i=prev[j]
         seg=[inst.depot]+path[i+1:j+1]+[inst.depot]
         load=pd[j]-pd[i]
-        sol.append((seg,load))
+        sol.append(make_route(seg,load,inst))
         j=i
     sol.reverse()
     return sol
@@ -229,6 +357,31 @@ def build_split_sol(inst):
     sol=intra_two_opt(sol,inst)
     return sol
 
+#   Multi-arranque paralelo (fases 1 y 2)
+
+_INST = None   # instancia de cada proceso hijo, fijada por _init_worker
+
+def _init_worker(inst):
+    # la instancia llega una vez por proceso (con fork, sin serializar)
+    # en lugar de viajar con cada tarea
+    global _INST
+    _INST = inst
+
+def _build_task(build, seed):
+    random.seed(seed)
+    return build(_INST)
+
+def multistart(pool, build, budget):
+    """Lanza build(inst) en lotes de WORKERS procesos hasta agotar budget
+    segundos. Devuelve las soluciones en orden de envío, no de llegada:
+    con la misma SEED la secuencia no depende de qué proceso acabe antes."""
+    t0=time.time()
+    while time.time()-t0 < budget:
+        futs=[pool.submit(_build_task, build, random.getrandbits(32))
+              for _ in range(WORKERS)]
+        for f in futs:
+            yield f.result()
+
 #   Main: ensamblar las cuatro fases + sanitización
 
 def main():
@@ -244,50 +397,51 @@ def main():
     iters  = 0
     start  = time.time()
 
-    # — Fase 1
-    while time.time()-start < PHASE1_TIME:
-        sol = constructive_with_ls(inst)
-        iters += 1
-        c = compute_cost(sol, inst)
-        if c>=ub and c<best_c:
-            best,best_c = sol,c
-            if (best_c-ub)/ub*100 <= 3.0:
-                print("GAP ≤ 3% logrado en fase 1")
-                break
-
-    # — Fase 2
-    if (best_c-ub)/ub*100 > 3.0:
-        t2=time.time()
-        print("Entrando en fase 2...")
-        while time.time()-t2 < PHASE2_TIME:
-            sol = build_split_sol(inst)
+    with ProcessPoolExecutor(max_workers=WORKERS, initializer=_init_worker,
+                             initargs=(inst,)) as pool:
+        # — Fase 1
+        for sol in multistart(pool, constructive_with_ls, PHASE1_TIME):
             iters += 1
             c = compute_cost(sol, inst)
             if c>=ub and c<best_c:
                 best,best_c = sol,c
                 if (best_c-ub)/ub*100 <= 3.0:
-                    print("GAP ≤ 3% logrado en fase 2")
+                    print("GAP ≤ 3% logrado en fase 1")
                     break
 
+        # — Fase 2
+        if (best_c-ub)/ub*100 > 3.0:
+            print("Entrando en fase 2...")
+            for sol in multistart(pool, build_split_sol, PHASE2_TIME):
+                iters += 1
+                c = compute_cost(sol, inst)
+                if c>=ub and c<best_c:
+                    best,best_c = sol,c
+                    if (best_c-ub)/ub*100 <= 3.0:
+                        print("GAP ≤ 3% logrado en fase 2")
+                        break
+
+    memo = {}   # 2-opt memorizado, compartido por las fases 3 y 4
+
     # — Fase 3
     if (best_c-ub)/ub*100 > 3.0:
         t3=time.time()
         print("Entrando en fase 3...")
         while time.time()-t3 < PHASE3_TIME:
-            nbr = deepcopy(best)
-            i = random.randrange(len(nbr))
-            ti,li = nbr[i]
-            poss = [p for p in range(1,len(ti)-1) if (ti[p],ti[p+1]) in inst.dem]
+            i = random.randrange(len(best))
+            ti,_,_,poss = best[i]
             if poss:
                 pos = random.choice(poss)
                 u,v = ti[pos],ti[pos+1]
-                d   = inst.dem[(u,v)]
-                j   = random.choice([x for x in range(len(nbr)) if x!=i])
-                tj,lj = nbr[j]
+                d   = inst.dem_mat[u][v]
+                j   = random.randrange(len(best)-1)
+                if j>=i: j+=1
+                lj  = best[j].load
                 if lj+d<=inst.Q:
-                    nbr[i] = (ti[:pos]+ti[pos+2:], li-d)
-                    nbr[j] = (tj[:-1]+[u,v]+[tj[-1]], lj+d)
-                    nbr = intra_two_opt(nbr,inst)
+                    # las rutas no se mutan in situ: basta copiar la lista
+                    nbr = best[:]
+                    relocate(nbr,i,pos,j,inst)
+                    nbr = intra_two_opt(nbr,inst,memo)
                     nbr = inter_relocate(nbr,inst)
                     c_n = compute_cost(nbr,inst)
                     if c_n>=ub and c_n<best_c:
@@ -302,7 +456,7 @@ def main():
         t4=time.time()
         print("Entrando en fase 4...")
         while time.time()-t4 < PHASE4_TIME:
-            cand = ejection_chain(deepcopy(best), inst, L=3)
+            cand = ejection_chain(best[:], inst, L=3, memo=memo)
             iters += 1
             cc = compute_cost(cand, inst)
             if cc>=ub and cc<best_c:
@@ -314,14 +468,15 @@ def main():
 
     # — Sanitización final: asegurar depósito en inicio/fin ——
     sanitized=[]
-    for idx,(tour,load) in enumerate(best, start=1):
+    for idx,r in enumerate(best, start=1):
+        tour=r.tour
         if tour[0]!=inst.depot:
             tour=[inst.depot]+tour
         if tour[-1]!=inst.depot:
             tour=tour+[inst.depot]
         if tour[0]!=inst.depot or tour[-1]!=inst.depot:
             raise RuntimeError(f"Ruta {idx} MALFORMADA: {tour}")
-        sanitized.append((tour,load))
+        sanitized.append(r._replace(tour=tour))
     best = sanitized
 
     # — Impresión final ————————————————————————————
@@ -332,7 +487,7 @@ def main():
 
     with open(sys.argv[2],'w', encoding='utf-8') as f:
         f.write(f"Instancia: {inst.name}\n")
-        for i,(tour,load) in enumerate(best,1):
+        for i,(tour,load,_,_) in enumerate(best,1):
             f.write(f"Ruta {i:2d} (carga={load:3d}): {'-'.join(map(str,tour))}\n")
         f.write(f"\nCoste total: {best_c}\n")
         f.write(f"BKS: {ub}\n")
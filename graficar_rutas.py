@@ -2,7 +2,16 @@
 import os
 import re
 import math
-import matplotlib.pyplot as plt
+from html import escape
+
+# Paleta 'tab20' (la misma que usaba matplotlib)
+TAB20 = ['#1f77b4', '#aec7e8', '#ff7f0e', '#ffbb78', '#2ca02c', '#98df8a',
+         '#d62728', '#ff9896', '#9467bd', '#c5b0d5', '#8c564b', '#c49c94',
+         '#e377c2', '#f7b6d2', '#7f7f7f', '#c7c7c7', '#bcbd22', '#dbdb8d',
+         '#17becf', '#9edae5']
+
+SIZE = 800      # lado del lienzo en px
+RADIO = 340     # radio del círculo de nodos en px
 
 def main():
     # Directorios relativos
@@ -21,6 +30,10 @@ def main():
             coords[node] = (math.cos(angle), math.sin(angle))
         return coords
 
+    # Pasar coordenadas del círculo unidad a píxeles (eje y hacia abajo)
+    def px(x, y):
+        return SIZE/2 + x*RADIO, SIZE/2 + 20 - y*RADIO
+
     # Contar vértices
     def contar_vertices(dat_path):
         with open(dat_path, encoding='utf-8') as f:
@@ -67,62 +80,71 @@ def main():
         inst_name = os.path.splitext(fname)[0]
         dat_path = os.path.join(dir_inst, inst_name + '.dat')
         sol_path = os.path.join(dir_sol, fname)
-        out_path = os.path.join(dir_graf, inst_name + '.png')
+        out_path = os.path.join(dir_graf, inst_name + '.svg')
 
         if not os.path.exists(dat_path):
             print(f'[Aviso] No encontrado: {dat_path}')
             continue
 
         n = contar_vertices(dat_path)
-        coords = generar_coordenadas(n)
+        coords = {node: px(x, y) for node, (x, y) in generar_coordenadas(n).items()}
         edges = leer_aristas(dat_path)
         rutas = leer_solucion(sol_path)
 
-        plt.figure(figsize=(8, 8))
+        out = [f'<svg xmlns="http://www.w3.org/2000/svg" width="{SIZE}" height="{SIZE}" '
+               f'viewBox="0 0 {SIZE} {SIZE}" font-family="sans-serif" font-weight="bold">',
+               '<rect width="100%" height="100%" fill="white"/>',
+               '<defs>']
+        # una punta de flecha por color de la paleta
+        for c, color in enumerate(TAB20):
+            out.append(f'<marker id="f{c}" viewBox="0 0 10 10" refX="10" refY="5" '
+                       f'markerWidth="6" markerHeight="6" orient="auto-start-reverse">'
+                       f'<path d="M0,0 L10,5 L0,10 z" fill="{color}"/></marker>')
+        out.append('</defs>')
+        out.append(f'<text x="{SIZE/2}" y="30" font-size="22" font-weight="normal" '
+                   f'text-anchor="middle">Solución: {escape(inst_name)}</text>')
 
         # Dibujar grafo base
         for u, v in edges:
             if u in coords and v in coords:
-                x1, y1 = coords[u]; x2, y2 = coords[v]
-                plt.plot([x1, x2], [y1, y2], color='lightgray', linewidth=1, zorder=1)
-
-        cmap = plt.get_cmap('tab20')
+                (x1, y1), (x2, y2) = coords[u], coords[v]
+                out.append(f'<line x1="{x1:.1f}" y1="{y1:.1f}" x2="{x2:.1f}" y2="{y2:.1f}" '
+                           f'stroke="lightgray" stroke-width="1"/>')
 
         # Dibujar rutas con flechas y numeración grande
+        pasos = []
         for idx, ruta in enumerate(rutas):
-            color = cmap(idx % 20)
+            c = idx % 20
+            color = TAB20[c]
             # flechas
             for i in range(len(ruta)-1):
                 u, v = ruta[i], ruta[i+1]
-                if u in coords and v in coords:
-                    x1, y1 = coords[u]; x2, y2 = coords[v]
-                    plt.annotate('', xy=(x2, y2), xytext=(x1, y1),
-                                 arrowprops=dict(arrowstyle='->', color=color, lw=2),
-                                 zorder=2)
-            # numeración de pasos en nodos
+                if u in coords and v in coords and u != v:
+                    (x1, y1), (x2, y2) = coords[u], coords[v]
+                    # recortar el final para que la punta no quede bajo el nodo
+                    d = math.hypot(x2-x1, y2-y1) or 1
+                    k = 1 - (12 if v == 1 else 7)/d
+                    x2, y2 = x1 + (x2-x1)*k, y1 + (y2-y1)*k
+                    out.append(f'<line x1="{x1:.1f}" y1="{y1:.1f}" x2="{x2:.1f}" y2="{y2:.1f}" '
+                               f'stroke="{color}" stroke-width="2" marker-end="url(#f{c})"/>')
+            # numeración de pasos en nodos (se dibuja sobre todas las flechas)
             for step, node in enumerate(ruta, start=1):
                 if node in coords:
                     x, y = coords[node]
-                    plt.text(x+0.05, y+0.05, str(step), color=color,
-                             fontsize=12, fontweight='bold', zorder=3)
+                    pasos.append(f'<text x="{x+0.05*RADIO:.1f}" y="{y-0.05*RADIO:.1f}" '
+                                 f'font-size="16" fill="{color}">{step}</text>')
+        out.extend(pasos)
 
         # Dibujar nodos y etiquetas
         for node, (x, y) in coords.items():
-            if node == 1:
-                plt.scatter(x, y, color='red', s=200, zorder=4)
-                plt.text(x, y, '1', fontsize=14, ha='center', va='center',
-                         color='white', fontweight='bold', zorder=5)
-            else:
-                plt.scatter(x, y, color='black', s=50, zorder=4)
-                plt.text(x, y, str(node), fontsize=12, ha='center', va='center',
-                         color='white', fontweight='bold', zorder=5)
-
-        plt.title(f'Solución: {inst_name}', fontsize=16)
-        plt.axis('equal')
-        plt.axis('off')
-        plt.tight_layout()
-        plt.savefig(out_path, dpi=150)
-        plt.close()
+            r, fill, size = (10, 'red', 18) if node == 1 else (5, 'black', 16)
+            out.append(f'<circle cx="{x:.1f}" cy="{y:.1f}" r="{r}" fill="{fill}"/>')
+            out.append(f'<text x="{x:.1f}" y="{y:.1f}" font-size="{size}" fill="white" '
+                       f'text-anchor="middle" dominant-baseline="central">{node}</text>')
+
+        out.append('</svg>')
+        with open(out_path, 'w', encoding='utf-8') as f:
+            f.write('\n'.join(out) + '\n')
         print(f'[OK] Gráfico guardado: {out_path}')
 
 if __name__ == '__main__':